@@ -2,13 +2,14 @@
 import sys
 import logging
 from pathlib import Path
-from src.catalogs import load_catalogs
+from src.catalogs import load_catalogs, parquet_path
 from src.indexer import IndicatorIndex
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%H:%M:%S')
 
 def main():
     indicators_file = "data/indicators.csv"
+    countries_file = "data/countries.csv"
     output_dir = "indices/index"
 
     print("\n" + "=" * 60)
@@ -20,9 +21,13 @@ def main():
         sys.exit(1)
 
     logging.info("Loading indicators...")
-    ind_df, _, _ = load_catalogs(indicators_path=indicators_file)
+    ind_df, cty_df, _ = load_catalogs(indicators_path=indicators_file, countries_path=countries_file)
     logging.info(f"Loaded {len(ind_df)} indicators")
 
+    logging.info("Writing Parquet copies of the catalogs...")
+    ind_df.to_parquet(parquet_path(indicators_file), index=False)
+    cty_df.to_parquet(parquet_path(countries_file), index=False)
+
     logging.info("Building embedding index...")
     index = IndicatorIndex()
     index.build(ind_df)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import sys
+import logging
+from src.catalogs import load_catalogs, normalize_country
+from src.parser import QuestionParser
+from test_api import QUESTIONS
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(message)s')
+
+
+def comparable(slots, aliases):
+    # the fast path sees lowercased text and tags its notes differently; compare what the engine uses
+    slots = dict(slots, unit_qualifiers=sorted(slots['unit_qualifiers']))
+    try:
+        slots['country_text'] = normalize_country(slots['country_text'], aliases)
+    except ValueError:
+        # the fast path only accepts mappable countries, so this shows up as a DIFF row
+        slots['country_text'] = f"unmapped: {slots['country_text']}"
+    del slots['notes']
+    return slots
+
+
+def main():
+    _, _, aliases = load_catalogs("data/indicators.csv", "data/countries.csv")
+    parser = QuestionParser(aliases=aliases)
+
+    print("Regex fast path vs DSPy\n" + "=" * 50)
+
+    checked = failed = 0
+    for question in QUESTIONS:
+        fast, llm = parser.parse_both_paths(question)
+        if fast is None:
+            continue
+
+        checked += 1
+        fast, llm = comparable(fast, aliases), comparable(llm, aliases)
+
+        if fast == llm:
+            print(f"OK    {question}")
+        else:
+            failed += 1
+            print(f"DIFF  {question}")
+            for key in fast:
+                if fast[key] != llm[key]:
+                    print(f"      {key}: regex={fast[key]!r} dspy={llm[key]!r}")
+
+    print(f"\n{'=' * 50}")
+    print(f"Fast-path questions: {checked}, mismatches: {failed}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
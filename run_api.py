@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
+import os
 import sys
+import asyncio
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -7,7 +9,9 @@ from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
+import httpx
 import uvicorn
 
 from src.query_engine import QueryEngine
@@ -16,6 +20,8 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 engine = None
+engine_ready = None
+engine_error = None
 
 class QuestionRequest(BaseModel):
     question: str = Field(..., json_schema_extra={"example": "What is the GDP of Saudi Arabia in 2022?"})
@@ -36,10 +42,49 @@ class QuestionResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: str
     parser: str
+    error: Optional[str] = None
+
+async def check_ollama():
+    try:
+        async with httpx.AsyncClient(timeout=2) as client:
+            resp = await client.get('http://localhost:11434/api/tags')
+        if resp.status_code == 200:
+            logger.info("Ollama detected")
+        else:
+            logger.warning("Ollama not available, using fallback parser")
+    except httpx.HTTPError:
+        logger.warning("Ollama not available, using fallback parser")
+
+async def init_engine(index_path):
+    global engine, engine_error
+
+    try:
+        await check_ollama()
+
+        # loading the model and index blocks, so it runs in a worker thread
+        engine = await asyncio.to_thread(
+            QueryEngine,
+            indicators_path="data/indicators.csv",
+            countries_path="data/countries.csv",
+            index_path=index_path,
+            dspy_model="llama3.2"
+        )
+        logger.info("API ready")
+    except Exception as e:
+        engine_error = f"{type(e).__name__}: {e}"
+        logger.error(f"Engine initialization failed: {e}", exc_info=True)
+    finally:
+        engine_ready.set()
+
+async def get_engine():
+    await engine_ready.wait()
+    if engine is None:
+        raise HTTPException(status_code=503, detail=f"Engine initialization failed: {engine_error}")
+    return engine
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global engine
+    global engine_ready
 
     logger.info("Starting API...")
 
@@ -49,27 +94,15 @@ async def lifespan(app: FastAPI):
         logger.error("Run: python build_index.py")
         raise FileNotFoundError(f"Missing index: {index_path}")
 
-    # check if ollama is running
-    try:
-        import requests
-        resp = requests.get('http://localhost:11434/api/tags', timeout=2)
-        if resp.status_code == 200:
-            logger.info("Ollama detected")
-        else:
-            logger.warning("Ollama not available, using fallback parser")
-    except:
-        logger.warning("Ollama not available, using fallback parser")
+    # accept connections right away; requests wait until the engine is loaded
+    engine_ready = asyncio.Event()
+    init_task = asyncio.create_task(init_engine(index_path))
 
-    engine = QueryEngine(
-        indicators_path="data/indicators.csv",
-        countries_path="data/countries.csv",
-        index_path=index_path,
-        dspy_model="llama3.2"
-    )
-
-    logger.info("API ready")
     yield
     logger.info("Shutting down")
+    init_task.cancel()
+    if engine is not None:
+        await engine.api_client.aclose()
 
 app = FastAPI(
     title="World Bank Query API",
@@ -101,21 +134,26 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health():
+    parser = "DSPy + Ollama (llama3.2)"
+
+    # answer probes right away: 503 "loading" while the engine loads, 503 "failed" if it never will
+    if not engine_ready.is_set():
+        return JSONResponse(status_code=503, content=HealthResponse(status="loading", parser=parser).model_dump())
     if engine is None:
-        raise HTTPException(status_code=503, detail="Engine not initialized")
+        content = HealthResponse(status="failed", parser=parser, error=engine_error).model_dump()
+        return JSONResponse(status_code=503, content=content)
 
     return HealthResponse(
         status="ok",
-        parser="DSPy + Ollama (llama3.2)"
+        parser=parser
     )
 
 @app.post("/query", response_model=QuestionResponse)
 async def query_post(request: QuestionRequest):
-    if engine is None:
-        raise HTTPException(status_code=503, detail="Engine not ready")
+    engine = await get_engine()
 
     try:
-        result = engine.answer(request.question)
+        result = await engine.aanswer(request.question)
         return QuestionResponse(**result)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
@@ -127,11 +165,10 @@ async def query_post(request: QuestionRequest):
 
 @app.get("/ask", response_model=QuestionResponse)
 async def query_get(q: str = Query(..., example="What is the GDP of Saudi Arabia in 2022?")):
-    if engine is None:
-        raise HTTPException(status_code=503, detail="Engine not ready")
+    engine = await get_engine()
 
     try:
-        result = engine.answer(q)
+        result = await engine.aanswer(q)
         return QuestionResponse(**result)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
@@ -147,13 +184,18 @@ if __name__ == "__main__":
     parser.add_argument('--host', default='0.0.0.0')
     parser.add_argument('--port', type=int, default=8000)
     parser.add_argument('--reload', action='store_true')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 1) // 2))
     args = parser.parse_args()
 
+    # --reload runs a single process; uvicorn ignores workers in that mode
+    workers = 1 if args.reload else args.workers
+
     print("\n" + "=" * 60)
     print("World Bank Query API")
     print("=" * 60)
     print(f"Starting on http://{args.host}:{args.port}")
     print(f"Docs at http://localhost:{args.port}/docs")
+    print(f"Workers: {workers}")
     print("=" * 60 + "\n")
 
     uvicorn.run(
@@ -161,5 +203,6 @@ if __name__ == "__main__":
         host=args.host,
         port=args.port,
         reload=args.reload,
+        workers=workers,
         log_level="info"
     )
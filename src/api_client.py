@@ -1,6 +1,11 @@
 import time
+import bisect
+import asyncio
 import logging
+import httpx
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class WorldBankClient:
@@ -10,6 +15,17 @@ class WorldBankClient:
         self.timeout = timeout
         self.retries = retries
 
+        # keep-alive connection pool so repeated calls skip the TCP/TLS handshake
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0)
+        self.session.mount("https://", adapter)
+
+        # async counterpart used by the API server so the event loop isn't blocked
+        self.aclient = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+
     def build_url(self, country_code, indicator_code, time_param):
         return f"{self.BASE_URL}/country/{country_code}/indicator/{indicator_code}?{time_param}&format=json&per_page=2000"
 
@@ -18,10 +34,10 @@ class WorldBankClient:
 
         for attempt in range(self.retries + 1):
             try:
-                response = requests.get(url, timeout=self.timeout)
+                response = self.session.get(url, timeout=self.timeout)
 
                 if response.status_code == 200:
-                    return response.json()
+                    return orjson.loads(response.content)
 
                 last_error = f"HTTP {response.status_code}"
                 logging.warning(f"Request failed with {last_error}, attempt {attempt + 1}/{self.retries + 1}")
@@ -40,12 +56,48 @@ class WorldBankClient:
 
         raise RuntimeError(f"World Bank API error after {self.retries + 1} attempts: {last_error}")
 
+    async def afetch(self, url):
+        last_error = None
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.aclient.get(url)
+
+                if response.status_code == 200:
+                    return orjson.loads(response.content)
+
+                last_error = f"HTTP {response.status_code}"
+                logging.warning(f"Request failed with {last_error}, attempt {attempt + 1}/{self.retries + 1}")
+
+            except httpx.TimeoutException:
+                last_error = "Request timeout"
+                logging.warning(f"Request timeout, attempt {attempt + 1}/{self.retries + 1}")
+
+            except httpx.HTTPError as e:
+                last_error = str(e)
+                logging.warning(f"Request error: {e}, attempt {attempt + 1}/{self.retries + 1}")
+
+            if attempt < self.retries:
+                wait_time = 0.5 * (2 ** attempt)
+                await asyncio.sleep(wait_time)
+
+        raise RuntimeError(f"World Bank API error after {self.retries + 1} attempts: {last_error}")
+
     def fetch_indicator(self, country_code, indicator_code, time_param, requested_year=None):
         url = self.build_url(country_code, indicator_code, time_param)
         response = self.fetch(url)
         value, actual_year = self.parse_value(response, requested_year)
         return value, actual_year, url
 
+    async def afetch_indicator(self, country_code, indicator_code, time_param, requested_year=None):
+        url = self.build_url(country_code, indicator_code, time_param)
+        response = await self.afetch(url)
+        value, actual_year = self.parse_value(response, requested_year)
+        return value, actual_year, url
+
+    async def aclose(self):
+        await self.aclient.aclose()
+
     @staticmethod
     def parse_value(payload, requested_year=None):
         if not isinstance(payload, list) or len(payload) < 2:
@@ -55,58 +107,63 @@ class WorldBankClient:
         if not isinstance(data, list):
             return None, None
 
-        # try to find the exact year first
-        if requested_year:
-            for row in data:
-                try:
-                    year = int(row.get("date"))
-                    if year == requested_year and row.get("value") is not None:
-                        return float(row["value"]), year
-                except (ValueError, TypeError):
-                    continue
-
-        # otherwise just grab the first available value
+        # single pass: return the exact year as soon as it shows up,
+        # remembering the first available value as the fallback
+        fallback = None
         for row in data:
-            if row.get("value") is not None:
-                try:
-                    value = float(row["value"])
-                    year = int(row.get("date"))
-                    return value, year
-                except (ValueError, TypeError):
-                    return float(row["value"]), None
+            value = row.get("value")
+            if value is None:
+                continue
 
-        return None, None
+            try:
+                year = int(row.get("date"))
+            except (ValueError, TypeError):
+                year = None
+
+            if not requested_year or year == requested_year:
+                return float(value), year
+
+            if fallback is None:
+                fallback = (float(value), year)
+
+        return fallback or (None, None)
+
+
+# World Bank indicator codes end in a fixed-width unit suffix
+SUFFIX_FORMATS = {".ZS": "percent", ".ZG": "percent", ".CD": "money", ".KD": "money", ".IN": "number"}
+
+# (magnitude, suffix) ladders, ascending; values below the first magnitude print as-is
+MONEY_SCALES = [(1e6, "M"), (1e9, "B"), (1e12, "T")]
+NUMBER_SCALES = [(1e3, "k"), (1e6, "M"), (1e9, "B")]
+MONEY_THRESHOLDS = [t for t, _ in MONEY_SCALES]
+NUMBER_THRESHOLDS = [t for t, _ in NUMBER_SCALES]
+
+
+def _scale(value, thresholds, scales):
+    i = bisect.bisect_right(thresholds, abs(value))
+    if i == 0:
+        return None
+    divisor, suffix = scales[i - 1]
+    return f"{value/divisor:.2f}{suffix}"
 
 
 def format_value(value, unit, ind_id):
     if value is None:
         return "n/a"
 
-    is_percentage = ind_id.endswith((".ZS", ".ZG")) or "%" in unit
-    is_money = ind_id.endswith((".CD", ".KD")) or "US$" in unit or "dollar" in unit.lower()
-    is_number = ind_id.endswith(".IN") or "number" in unit.lower()
+    category = SUFFIX_FORMATS.get(ind_id[-3:])
+    unit_lc = unit.lower()
 
-    if is_percentage:
+    if category == "percent" or "%" in unit:
         return f"{value:.2f}%"
 
-    if is_money:
-        abs_val = abs(value)
-        if abs_val >= 1e12:
-            return f"${value/1e12:.2f}T"
-        elif abs_val >= 1e9:
-            return f"${value/1e9:.2f}B"
-        elif abs_val >= 1e6:
-            return f"${value/1e6:.2f}M"
-        else:
-            return f"${value:,.2f}"
-
-    if is_number:
-        abs_val = abs(value)
-        if abs_val >= 1e9:
-            return f"{value/1e9:.2f}B"
-        elif abs_val >= 1e6:
-            return f"{value/1e6:.2f}M"
-        elif abs_val >= 1e3:
-            return f"{value/1e3:.2f}k"
+    if category == "money" or "US$" in unit or "dollar" in unit_lc:
+        scaled = _scale(value, MONEY_THRESHOLDS, MONEY_SCALES)
+        return f"${scaled}" if scaled else f"${value:,.2f}"
+
+    if category == "number" or "number" in unit_lc:
+        scaled = _scale(value, NUMBER_THRESHOLDS, NUMBER_SCALES)
+        if scaled:
+            return scaled
 
     return f"{value:,.2f}"
@@ -1,11 +1,71 @@
 import json
 import os
+import pickle
+import logging
+import tempfile
 import pandas as pd
 
 
+CACHE_FILE = ".catalogs_cache.pkl"
+
+
+def _cache_key(*paths):
+    return tuple((os.path.abspath(p), os.path.getmtime(p)) for p in paths if p and os.path.exists(p))
+
+
 def load_catalogs(indicators_path="data/indicators.csv", countries_path="data/countries.csv", aliases_json=None):
-    ind_df = pd.read_csv(indicators_path)
-    cty_df = pd.read_csv(countries_path)
+    # reuse the parsed catalogs while none of the source files have changed
+    cache_path = os.path.join(os.path.dirname(indicators_path), CACHE_FILE)
+    key = _cache_key(indicators_path, countries_path, aliases_json)
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached["key"] == key:
+                return cached["ind_df"], cached["cty_df"], cached["aliases"]
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable catalog cache {cache_path}: {e}")
+
+    ind_df, cty_df, aliases = _parse_catalogs(indicators_path, countries_path, aliases_json)
+
+    # several workers may start at once: write a temp file and swap it in, so readers never see a partial pickle
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(cache_path) or ".",
+                                         prefix=CACHE_FILE, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            pickle.dump({"key": key, "ind_df": ind_df, "cty_df": cty_df, "aliases": aliases}, f)
+        # NamedTemporaryFile creates 0600; give the cache the usual 0644 (less umask) so other users can read it
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o644 & ~umask)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.warning(f"Could not write catalog cache {cache_path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return ind_df, cty_df, aliases
+
+
+def parquet_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _read_table(csv_path):
+    # prefer the typed Parquet copy written by build_index.py, unless the CSV is newer
+    pq_path = parquet_path(csv_path)
+    if os.path.exists(pq_path) and os.path.getmtime(pq_path) >= os.path.getmtime(csv_path):
+        return pd.read_parquet(pq_path)
+
+    # Arrow's multithreaded CSV reader; same frames as the default C parser
+    return pd.read_csv(csv_path, engine="pyarrow")
+
+
+def _parse_catalogs(indicators_path, countries_path, aliases_json):
+    ind_df = _read_table(indicators_path)
+    cty_df = _read_table(countries_path)
 
     aliases = {}
 
@@ -15,10 +75,8 @@ def load_catalogs(indicators_path="data/indicators.csv", countries_path="data/co
             aliases.update(json.load(f))
 
     # build aliases from country table
-    for _, row in cty_df.iterrows():
-        wb3 = str(row["wb3_code"])
-        for key in [str(row["name"]), str(row["iso3"]), str(row["wb2_code"]), wb3]:
-            aliases[str(key).lower()] = wb3
+    rows = cty_df[["name", "iso3", "wb2_code", "wb3_code"]].itertuples(index=False, name=None)
+    aliases.update({str(key).lower(): str(row[3]) for row in rows for key in row})
 
     # add some common shortcuts
     aliases.update({
@@ -1,111 +1,188 @@
 import os
+import re
 import pickle
+import platform
+import functools
 import pandas as pd
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 import faiss
 
 
+# HNSW graph parameters: neighbours per node, build-time and query-time beam width
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Documents per forward pass when encoding the catalog
+ENCODE_BATCH_SIZE = 256
+
+# Dynamically quantized INT8 ONNX exports shipped with the sentence-transformers models, one per
+# instruction set. The AVX-512 builds are quantized without reduce_range and can saturate elsewhere.
+ONNX_INT8_FILES = {
+    "avx512_vnni": "onnx/model_qint8_avx512_vnni.onnx",
+    "avx512": "onnx/model_qint8_avx512.onnx",
+    "avx2": "onnx/model_quint8_avx2.onnx",
+    "arm64": "onnx/model_qint8_arm64.onnx",
+}
+
+# Number of distinct expanded queries whose embeddings are kept in memory
+QUERY_CACHE_SIZE = 4096
+
+# Common synonyms appended to search queries, in the order they are added
+QUERY_SYNONYMS = {
+    "female": " women girls",
+    "male": " men boys",
+    "population": " people inhabitants",
+    "gdp": " gross domestic product economy",
+    "unemployment": " jobless without work",
+    "inflation": " cpi consumer price index",
+    "65+": " ages 65 and above elderly older senior",
+    "15-24": " youth young ages 15 to 24",
+}
+
+# Lookahead alternation so overlapping terms ("male" inside "female") all match
+SYNONYM_PATTERN = re.compile("(?=(" + "|".join(map(re.escape, QUERY_SYNONYMS)) + "))", re.IGNORECASE)
+
+# Metadata hints derived from indicator ID codes, for better matching
+ID_METADATA = [
+    (".FE", "female"),
+    (".MA", "male"),
+    (".ZG", "growth rate annual percentage"),
+    (".ZS", "percentage share"),
+    (".CD", "current US dollars"),
+    (".KD", "constant US dollars"),
+    (".PP", "PPP purchasing power parity"),
+    (".PC", "per capita"),
+    ("1524", "ages 15-24 youth"),
+    ("65UP", "ages 65 and above elderly"),
+]
+
+
+def default_onnx_file():
+    """Pick the INT8 ONNX export matching the host CPU."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return ONNX_INT8_FILES["arm64"]
+
+    # CPU flags are only readable on Linux; elsewhere use the AVX2 build, which runs on any x86-64 CPU with AVX2
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = next((line.split(":", 1)[1].split() for line in f if line.startswith("flags")), [])
+    except OSError:
+        flags = []
+
+    if "avx512_vnni" in flags:
+        return ONNX_INT8_FILES["avx512_vnni"]
+    if "avx512f" in flags:
+        return ONNX_INT8_FILES["avx512"]
+    return ONNX_INT8_FILES["avx2"]
+
+
+def _text_column(df, column):
+    if column not in df:
+        return pd.Series("", index=df.index)
+    return df[column].fillna("").astype(str)
+
+
 def build_document_corpus(ind_df):
-    ids = []
-    docs = []
-
-    for _, row in ind_df.iterrows():
-        ind_id = row["id"]
-        name = str(row["name"])
-        unit = str(row.get("unit", ""))
-        source_note = str(row.get("sourceNote", ""))
-        topics = str(row.get("topics", ""))
-
-        # Extract metadata from indicator ID for better matching
-        id_parts = []
-        if ".FE" in ind_id:
-            id_parts.append("female")
-        if ".MA" in ind_id:
-            id_parts.append("male")
-        if ".ZG" in ind_id:
-            id_parts.append("growth rate annual percentage")
-        if ".ZS" in ind_id:
-            id_parts.append("percentage share")
-        if ".CD" in ind_id:
-            id_parts.append("current US dollars")
-        if ".KD" in ind_id:
-            id_parts.append("constant US dollars")
-        if ".PP" in ind_id:
-            id_parts.append("PPP purchasing power parity")
-        if ".PC" in ind_id:
-            id_parts.append("per capita")
-        if "1524" in ind_id:
-            id_parts.append("ages 15-24 youth")
-        if "65UP" in ind_id:
-            id_parts.append("ages 65 and above elderly")
-
-        metadata = " ".join(id_parts)
-
-        # Build document with weighted fields
-        title = f"{name} {unit}".strip()
-        doc = f"{title}. {metadata}. {source_note}. Topics: {topics}".strip()
-
-        ids.append(ind_id)
-        docs.append(doc)
-
-    return ids, docs
+    ids = ind_df["id"].astype(str)
+    name = _text_column(ind_df, "name")
+    unit = _text_column(ind_df, "unit")
+    source_note = _text_column(ind_df, "sourceNote")
+    topics = _text_column(ind_df, "topics")
+
+    # Extract metadata from indicator ID for better matching
+    metadata = pd.Series("", index=ind_df.index)
+    for code, text in ID_METADATA:
+        mask = ids.str.contains(code, regex=False).to_numpy()
+        metadata = metadata + np.where(mask, text + " ", "")
+    metadata = metadata.str.rstrip()
+
+    # Build document with weighted fields
+    title = (name + " " + unit).str.strip()
+    docs = (title + ". " + metadata + ". " + source_note + ". Topics: " + topics).str.strip()
+
+    return ids.tolist(), docs.tolist()
 
 
 class IndicatorIndex:
-    def __init__(self, model_name="all-mpnet-base-v2"):
+    def __init__(self, model_name="all-mpnet-base-v2", backend="torch", onnx_file=None):
         self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
         self.ids = []
+        self._id_array = np.array([], dtype=object)
         self.docs = []
         self.model = None
         self.index = None
         self.embeddings = None
-
+        self._encode_cached = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._encode)
 
     def build(self, ind_df):
         self.ids, self.docs = build_document_corpus(ind_df)
-        self.model = SentenceTransformer(self.model_name)
-        self.embeddings = self.model.encode(self.docs, normalize_embeddings=True, show_progress_bar=True)
-
-        dim = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dim)
-        self.index.add(self.embeddings.astype('float32'))
-
-    def search(self, query, top_k=30):
-        # Expand query with synonyms for better matching
-        query_expanded = query
-
-        # Add common synonyms
-        if "female" in query.lower():
-            query_expanded += " women girls"
-        if "male" in query.lower():
-            query_expanded += " men boys"
-        if "population" in query.lower():
-            query_expanded += " people inhabitants"
-        if "gdp" in query.lower():
-            query_expanded += " gross domestic product economy"
-        if "unemployment" in query.lower():
-            query_expanded += " jobless without work"
-        if "inflation" in query.lower():
-            query_expanded += " cpi consumer price index"
-        if "65+" in query:
-            query_expanded += " ages 65 and above elderly older senior"
-        if "15-24" in query:
-            query_expanded += " youth young ages 15 to 24"
-
-        query_vec = self.model.encode([query_expanded], normalize_embeddings=True).astype('float32')
-
-        # Fetch more candidates for better filtering
-        search_k = min(top_k * 2, len(self.ids))
-        distances, indices = self.index.search(query_vec, search_k)
-
-        results = []
-        for idx, i in enumerate(indices[0]):
-            if idx >= top_k:
-                break
-            results.append((self.ids[i], float(distances[0][idx])))
-
-        return results
+        self._id_array = np.array(self.ids, dtype=object)
+        self._load_model()
+        if self.backend != "onnx" and self.model.device.type == "cpu":
+            # offline catalog encode: use every core (serving workers keep torch's default)
+            torch.set_num_threads(os.cpu_count() or 1)
+        embeddings = self.model.encode(self.docs, batch_size=ENCODE_BATCH_SIZE, normalize_embeddings=True,
+                                       convert_to_numpy=True, show_progress_bar=True)
+
+        # the index holds its own copy of the vectors, so the raw array isn't kept around
+        self.index = self._build_faiss_index(embeddings)
+        self.embeddings = None
+
+    def _load_model(self):
+        if self.backend == "onnx":
+            # INT8 ONNX Runtime session; same encode() API as the torch model
+            self.model = SentenceTransformer(
+                self.model_name,
+                device="cpu",
+                backend="onnx",
+                model_kwargs={"file_name": self.onnx_file or default_onnx_file(),
+                              "provider": "CPUExecutionProvider"}
+            )
+        else:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.model = SentenceTransformer(self.model_name, device=device)
+
+        self._encode_cached.cache_clear()
+
+    @staticmethod
+    def _build_faiss_index(embeddings):
+        dim = embeddings.shape[1]
+        # 8-bit scalar quantized vectors: 1 byte per dimension instead of 4
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        vectors = np.ascontiguousarray(embeddings, dtype='float32')
+        index.train(vectors)
+        index.add(vectors)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    def _encode(self, query_expanded):
+        vec = self.model.encode([query_expanded], normalize_embeddings=True)
+        return vec.astype('float32').tobytes()
+
+    def encode_query(self, query_expanded):
+        return np.frombuffer(self._encode_cached(query_expanded), dtype=np.float32).reshape(1, -1)
+
+    def search(self, query, top_k=30, query_vec=None):
+        if query_vec is None:
+            query_vec = self.encode_query(self.expand_query(query))
+
+        distances, indices = self.index.search(query_vec, min(top_k, len(self.ids)))
+
+        # HNSW pads with -1 when it finds fewer than top_k neighbours
+        valid = indices[0] >= 0
+        return list(zip(self._id_array[indices[0][valid]].tolist(), distances[0][valid].tolist()))
+
+    @staticmethod
+    def expand_query(query):
+        # Expand query with synonyms for better matching; one pass finds every term
+        hits = {m.group(1).lower() for m in SYNONYM_PATTERN.finditer(query)}
+        return query + "".join(extra for term, extra in QUERY_SYNONYMS.items() if term in hits)
 
     def save(self, path):
         os.makedirs(path, exist_ok=True)
@@ -119,8 +196,8 @@ class IndicatorIndex:
         with open(os.path.join(path, 'metadata.pkl'), 'wb') as f:
             pickle.dump(metadata, f)
 
+        # the quantized index is all search needs; raw embeddings stay a build-time artifact
         faiss.write_index(self.index, os.path.join(path, 'faiss.index'))
-        np.save(os.path.join(path, 'embeddings.npy'), self.embeddings)
 
     def load(self, path):
         with open(os.path.join(path, 'metadata.pkl'), 'rb') as f:
@@ -128,8 +205,15 @@ class IndicatorIndex:
 
         self.model_name = metadata['model_name']
         self.ids = metadata['ids']
+        self._id_array = np.array(self.ids, dtype=object)
         self.docs = metadata['docs']
 
-        self.model = SentenceTransformer(self.model_name)
-        self.index = faiss.read_index(os.path.join(path, 'faiss.index'))
-        self.embeddings = np.load(os.path.join(path, 'embeddings.npy'))
+        self._load_model()
+        # the vector codes are memory-mapped read-only and shared by workers through the page cache;
+        # the HNSW graph itself is still loaded into each process
+        self.index = faiss.read_index(os.path.join(path, 'faiss.index'), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        # a flat index from before the HNSW switch still loads; it just has no efSearch to set
+        if hasattr(self.index, 'hnsw'):
+            self.index.hnsw.efSearch = HNSW_EF_SEARCH
+
+        self.embeddings = None
@@ -1,5 +1,67 @@
+import re
 import dspy
 import logging
+import threading
+from collections import OrderedDict
+
+from .catalogs import normalize_country
+
+
+FEMALE_WORDS = ("female", "females", "women", "woman", "girls")
+MALE_WORDS = ("male", "males", "men", "man", "boys")
+SHARE_WORDS = ("growth", "%", "percent", "share", "ratio")
+
+# Common question templates answered without the LLM; anything else goes to DSPy
+QUESTION_PATTERNS = [
+    re.compile(r"^what(?:'s| is| was) the (?P<concept>[a-z ]+?) (?:of|for|in) (?P<country>[a-z .'-]+?)"
+               r"(?: in (?P<year>\d{4}))?\s*\??$"),
+    re.compile(r"^(?P<concept>[a-z ]+?) (?:of|for|in) (?P<country>[a-z .'-]+?) in (?P<year>\d{4})\s*\??$"),
+]
+
+# Concept words that only DSPy's unit/demographics fields capture, so the fast path can't handle them
+FAST_PATH_EXCLUDED = {"usd", "dollar", "dollars", "constant", "current", "nominal", "real", "percent",
+                      "percentage", "latest", "recent", "age", "aged", "ages", "above", "over", "plus",
+                      *FEMALE_WORDS, *MALE_WORDS}
+
+# Qualifier words the keyword scan in _build_slots already turns into slots, so they aren't part of the concept
+FAST_PATH_FILLER_WORDS = {"total", "annual", "growth", "rate", "per", "capita"}
+
+# Concepts the fast path may emit, mapped to the canonical name DSPy is asked to return; the
+# resolver's priors key on these exact names, so any other phrase is left to DSPy
+FAST_PATH_CONCEPTS = {
+    "gdp": "gdp",
+    "gross domestic product": "gdp",
+    "population": "population",
+    "inflation": "inflation",
+    "unemployment": "unemployment",
+}
+
+# Number of distinct normalized questions whose parsed slots are kept in memory
+PARSE_CACHE_SIZE = 10_000
+
+# Every keyword the parser looks for in the question
+QUESTION_KEYWORDS = (
+    "cpi", "consumer price index", "latest", "most recent", "growth rate", "yoy",
+    "per capita", "ppp", " rate", "unemployment", "inflation",
+    "total population", "total pop", "population", "total",
+) + FEMALE_WORDS + MALE_WORDS + SHARE_WORDS
+
+# Longest-first lookahead alternation: one pass reports a keyword at every position it starts,
+# and any shorter keyword starting at the same spot is a substring of the one reported
+QUESTION_KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(set(QUESTION_KEYWORDS), key=len, reverse=True)) + "))"
+)
+
+
+def scan_keywords(text):
+    """Return the set of QUESTION_KEYWORDS occurring (as substrings) in text."""
+    found = {m.group(1) for m in QUESTION_KEYWORD_PATTERN.finditer(text)}
+    return {k for k in QUESTION_KEYWORDS if any(k in f for f in found)}
+
+
+def normalize_question(question):
+    """Lowercase and collapse whitespace; the parse cache key and the text the templates see."""
+    return " ".join(question.split()).lower()
 
 
 class QuestionToParameters(dspy.Signature):
@@ -20,14 +82,93 @@ class QuestionToParameters(dspy.Signature):
 
 
 class QuestionParser:
-    def __init__(self, model="llama3.2"):
+    def __init__(self, model="llama3.2", aliases=None):
         lm = dspy.LM(f'ollama_chat/{model}', api_base='http://localhost:11434', api_key='')
         dspy.configure(lm=lm)
         self.predictor = dspy.ChainOfThought(QuestionToParameters)
+        self.aliases = aliases
+
+        # LRU of parsed slots keyed on the normalized question; parse() runs in worker threads
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = self._cache_misses = 0
 
     def parse(self, question):
+        # repeated questions skip the LLM round-trip entirely; case and spacing don't matter for the key
+        key = normalize_question(question)
+
+        with self._cache_lock:
+            slots = self._cache.get(key)
+            if slots is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+            hits, misses = self._cache_hits, self._cache_misses
+
+        if slots is None:
+            slots = self._parse(key, question)
+            with self._cache_lock:
+                self._cache[key] = slots
+                if len(self._cache) > PARSE_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+
+        logging.info(f"Parser cache: {hits} hits, {misses} misses, hit rate {hits / (hits + misses):.1%}")
+
+        # callers get their own copy so cached slots can't be mutated
+        return dict(slots, unit_qualifiers=list(slots['unit_qualifiers']))
+
+    def parse_both_paths(self, question):
+        """Parse uncached with the regex fast path and with DSPy; (None, None) if no template matches."""
+        normalized = normalize_question(question)
+        parsed = self._parse_with_patterns(normalized)
+        if not parsed:
+            return None, None
+        return self._build_slots(normalized, parsed, notes="regex"), self._parse_with_dspy(question)
+
+    def _parse(self, normalized, question):
+        # the templates are written for the normalized text; the LLM gets the question as asked
+        parsed = self._parse_with_patterns(normalized)
+        if parsed:
+            return self._build_slots(normalized, parsed, notes="regex")
         return self._parse_with_dspy(question)
 
+    def _parse_with_patterns(self, question):
+        # only used when we can check the country against the alias table
+        if not self.aliases:
+            return None
+
+        for pattern in QUESTION_PATTERNS:
+            match = pattern.match(question)
+            if not match:
+                continue
+
+            words = match.group("concept").split()
+            country = match.group("country").strip()
+            if not FAST_PATH_EXCLUDED.isdisjoint(words):
+                return None
+
+            concept = FAST_PATH_CONCEPTS.get(" ".join(w for w in words if w not in FAST_PATH_FILLER_WORDS))
+            if concept is None:
+                return None
+
+            try:
+                normalize_country(country, self.aliases)
+            except ValueError:
+                return None
+
+            parsed = {
+                'country': country,
+                'concept': concept,
+                'year': match.group("year") or '',
+                'unit': None,
+                'demographics': None
+            }
+            logging.info(f"Regex extracted: country='{country}', concept='{concept}', year='{parsed['year']}'")
+            return parsed
+
+        return None
+
     def _parse_with_dspy(self, question):
         result = self.predictor(question=question)
         parsed = {
@@ -41,11 +182,14 @@ class QuestionParser:
         logging.info(f"DSPy extracted: country='{parsed['country']}', concept='{parsed['concept']}', "
                      f"year='{parsed['year']}', unit='{parsed['unit']}', demographics='{parsed['demographics']}'")
 
-        q = question.lower()
+        return self._build_slots(question, parsed, notes="DSPy+Ollama")
+
+    def _build_slots(self, question, parsed, notes):
+        hits = scan_keywords(question.lower())
         country_text = parsed.get('country', '')
         concept = parsed.get('concept', '').lower().replace(' ', '_')
 
-        if "cpi" in q or "consumer price index" in q:
+        if "cpi" in hits or "consumer price index" in hits:
             concept = "inflation_cpi"
 
         year_str = parsed.get('year', '')
@@ -54,18 +198,18 @@ class QuestionParser:
 
         if year_str and year_str.isdigit():
             year = int(year_str)
-        elif "latest" in q or "most recent" in q:
+        elif "latest" in hits or "most recent" in hits:
             time_mode = "latest_n"
             latest_n = 1
 
         unit_qualifiers = []
         unit = (parsed.get('unit') or '').lower()
 
-        has_growth = 'growth rate' in q or 'growth' in q or 'yoy' in q
+        has_growth = 'growth rate' in hits or 'growth' in hits or 'yoy' in hits
 
-        if 'per capita' in unit or 'per capita' in q:
+        if 'per capita' in unit or 'per capita' in hits:
             unit_qualifiers.append("per_capita")
-        if 'ppp' in unit or 'ppp' in q:
+        if 'ppp' in unit or 'ppp' in hits:
             unit_qualifiers.append("ppp")
 
         if not has_growth:
@@ -78,9 +222,9 @@ class QuestionParser:
             unit_qualifiers.append("growth_rate")
         elif '%' in unit or 'percent' in unit:
             unit_qualifiers.append("percent_share")
-        elif ' rate' in q:
+        elif ' rate' in hits:
             # Don't add percent_share for concepts that are inherently rates
-            if "unemployment" not in q and "inflation" not in q and "cpi" not in q:
+            if "unemployment" not in hits and "inflation" not in hits and "cpi" not in hits:
                 unit_qualifiers.append("percent_share")
 
         demographics = (parsed.get('demographics') or '').lower()
@@ -91,21 +235,21 @@ class QuestionParser:
 
         if not is_demographic_concept:
             sex = "total"
-        elif "total population" in q or "total pop" in q or ("population" in q and "total" in q):
+        elif "total population" in hits or "total pop" in hits or ("population" in hits and "total" in hits):
             sex = "total"
-            if not any(x in q for x in ["growth", "%", "percent", "share", "ratio"]):
+            if hits.isdisjoint(SHARE_WORDS):
                 if "count_number" not in unit_qualifiers:
                     unit_qualifiers.append("count_number")
-        elif any(word in q for word in ["female", "females", "women", "woman", "girls"]):
+        elif not hits.isdisjoint(FEMALE_WORDS):
             sex = "female"
-        elif any(word in q for word in ["male", "males", "men", "man", "boys"]) and not any(word in q for word in ["female", "females"]):
+        elif not hits.isdisjoint(MALE_WORDS) and "female" not in hits:
             sex = "male"
         elif "female" in demographics or "women" in demographics:
             sex = "female"
         elif ("male" in demographics or "men" in demographics) and "female" not in demographics:
             sex = "male"
 
-        if "population" in concept and sex == "total" and not any(x in q for x in ["growth", "%", "percent", "share", "ratio"]):
+        if "population" in concept and sex == "total" and hits.isdisjoint(SHARE_WORDS):
             if "count_number" not in unit_qualifiers:
                 unit_qualifiers.append("count_number")
 
@@ -126,7 +270,7 @@ class QuestionParser:
             'unit_qualifiers': unit_qualifiers,
             'sex': sex,
             'age_band': age_band,
-            'notes': "DSPy+Ollama"
+            'notes': notes
         }
 
         logging.info(f"Final parsed: concept='{concept}', sex='{sex}', age_band='{age_band}', qualifiers={unit_qualifiers}")
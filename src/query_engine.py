@@ -1,3 +1,5 @@
+import asyncio
+
 from .catalogs import load_catalogs, normalize_country
 from .parser import QuestionParser, build_time_params
 from .indexer import IndicatorIndex
@@ -7,11 +9,12 @@ from .api_client import WorldBankClient, format_value
 
 class QueryEngine:
     def __init__(self, indicators_path="data/indicators.csv", countries_path="data/countries.csv",
-                 aliases_json=None, index_path=None, dspy_model="llama3.2"):
+                 aliases_json=None, index_path=None, dspy_model="llama3.2",
+                 encoder_backend="torch", onnx_file=None):
         self.ind_df, self.cty_df, self.aliases = load_catalogs(indicators_path, countries_path, aliases_json)
-        self.parser = QuestionParser(model=dspy_model)
+        self.parser = QuestionParser(model=dspy_model, aliases=self.aliases)
 
-        self.index = IndicatorIndex()
+        self.index = IndicatorIndex(backend=encoder_backend, onnx_file=onnx_file)
         if index_path:
             self.index.load(index_path)
         else:
@@ -21,6 +24,25 @@ class QueryEngine:
         self.api_client = WorldBankClient()
 
     def answer(self, question):
+        country_code, time_param, requested_year, match = self._prepare(question)
+
+        value, actual_year, api_url = self.api_client.fetch_indicator(
+            country_code, match[0], time_param, requested_year
+        )
+
+        return self._build_result(question, country_code, requested_year, match, value, actual_year, api_url)
+
+    async def aanswer(self, question):
+        # parsing (Ollama) and encoding block, so keep them off the event loop
+        country_code, time_param, requested_year, match = await asyncio.to_thread(self._prepare, question)
+
+        value, actual_year, api_url = await self.api_client.afetch_indicator(
+            country_code, match[0], time_param, requested_year
+        )
+
+        return self._build_result(question, country_code, requested_year, match, value, actual_year, api_url)
+
+    def _prepare(self, question):
         slots = self.parser.parse(question)
         country_code = normalize_country(slots.get("country_text", ""), self.aliases)
         time_param, requested_year = build_time_params(slots)
@@ -28,12 +50,12 @@ class QueryEngine:
         query_text = build_query_terms(slots)
         search_results = self.index.search(query_text, top_k=50)
 
-        ind_code, ind_name, ind_unit, confidence, notes = self.resolver.resolve(slots, search_results)
-
-        value, actual_year, api_url = self.api_client.fetch_indicator(
-            country_code, ind_code, time_param, requested_year
-        )
+        match = self.resolver.resolve(slots, search_results)
+        return country_code, time_param, requested_year, match
 
+    @staticmethod
+    def _build_result(question, country_code, requested_year, match, value, actual_year, api_url):
+        ind_code, ind_name, ind_unit, confidence, notes = match
         value_str = format_value(value, ind_unit, ind_code)
 
         result = {
@@ -1,78 +1,199 @@
+import re
+import functools
+import numpy as np
 import pandas as pd
 
 
-def is_percent(ind_id, name, unit):
-    return ind_id.endswith(".ZS") or "%)" in name or "%" in unit or "percent" in unit.lower()
-
-
-def is_growth(ind_id, name):
-    return ind_id.endswith(".ZG") or "growth (annual %)" in name.lower()
-
-
-def is_count(ind_id, unit):
-    if ind_id.endswith(".ZS") or ind_id.endswith(".ZG"):
-        return False
-    return ind_id.endswith(".IN") or "number" in unit.lower() or unit.strip() == ""
-
-
-def is_ppp(ind_id, name):
-    return ".PP" in ind_id or "ppp" in name.lower()
-
-
-def is_constant(ind_id, name):
-    return ind_id.endswith(".KD") or "constant" in name.lower()
-
-
-def is_current_usd(ind_id, name, unit):
-    return ind_id.endswith(".CD") or "current us$" in name.lower() or "current" in unit.lower()
-
-
-def has_sex(ind_id, sex):
+# Age tokens such as "65+", "15-24", "65 and above"; bounded so a long run can't backtrack badly
+AGE_TOKENS = r'(?:\d+|[-+]|\s|and|above){1,20}'
+
+# Parenthesised groups made only of sex/age tokens, e.g. "(female)", "(ages 15-24, male)";
+# groups with other words ("(% of male labor force)") are kept and only lose the sex word.
+# Each token is one character or a fixed word, so the match can't backtrack badly.
+DEMOGRAPHIC_FILLER = r'(?:[\s,+\-\d]|and|above)'
+DEMOGRAPHIC_WORD = r'(?:(?:fe)?male|ages?)'
+DEMOGRAPHIC_GROUP = (r'\(' + DEMOGRAPHIC_FILLER + '*' + DEMOGRAPHIC_WORD +
+                     r'(?:' + DEMOGRAPHIC_FILLER + '|' + DEMOGRAPHIC_WORD + r')*\)')
+
+# Concept cleanup in a single pass: age/demographic info is captured separately in the slots.
+# Alternatives, in order: "(ages 65+)", demographic-only groups,
+# "female" / "male ages 15-24", "ages 65 and above"
+RE_CONCEPT_NOISE = re.compile(
+    r'\s*\(ages?\s+' + AGE_TOKENS + r'\)'
+    r'|\s*' + DEMOGRAPHIC_GROUP +
+    r'|\b(?:fe)?male(?:\s+ages?\s+' + AGE_TOKENS + r')?'
+    r'|\bages?\s+' + AGE_TOKENS,
+    re.IGNORECASE
+)
+RE_WHITESPACE = re.compile(r'\s+')
+
+QUERY_TERMS_CACHE_SIZE = 1024
+
+
+# Per-indicator classification bits, computed once from the static catalog
+PCT = 1 << 0
+GROWTH = 1 << 1
+COUNT = 1 << 2
+PPP = 1 << 3
+CONSTANT = 1 << 4
+CURRENT_USD = 1 << 5
+PER_CAPITA = 1 << 6
+RATE = 1 << 7
+SEX_FE = 1 << 8
+SEX_MA = 1 << 9
+SEX_SPLIT = 1 << 10
+AGE_65UP = 1 << 11
+AGE_1524 = 1 << 12
+AGE_0T04 = 1 << 13
+AGE_1564 = 1 << 14
+# series that get a concept-specific prior boost
+CPI_HEADLINE = 1 << 15
+GDP_MKTP = 1 << 16
+POP_SERIES = 1 << 17
+POP_TOTAL = 1 << 18
+
+UNIT_QUALIFIER_FLAGS = {
+    "ppp": PPP,
+    "growth_rate": GROWTH,
+    "percent_share": PCT,
+    "count_number": COUNT,
+    "constant_usd": CONSTANT,
+    "current_usd": CURRENT_USD,
+    "per_capita": PER_CAPITA,
+}
+
+# Score weights for the semantic, unit, demographics and prior features
+SCORE_WEIGHTS = (0.45, 0.25, 0.15, 0.10)
+
+AGE_FLAGS = {"65up": AGE_65UP, "1524": AGE_1524, "0t04": AGE_0T04, "1564": AGE_1564}
+# Flags implied by the last segment of a World Bank id, e.g. NY.GDP.MKTP.CD -> "CD"
+SUFFIX_FLAGS = {
+    "ZS": PCT,
+    "ZG": GROWTH,
+    "IN": COUNT,
+    "KD": CONSTANT,
+    "CD": CURRENT_USD,
+    "FE": SEX_FE,
+    "MA": SEX_MA,
+}
+
+AGE_CODE_FLAGS = (("65UP", AGE_65UP), ("1524", AGE_1524), ("0T04", AGE_0T04), ("1564", AGE_1564))
+
+
+def compute_flags(ind_id, name_lc, unit_lc):
+    """Classification bitmask for one indicator; name and unit are already lowercased."""
+    _, dot, suffix = ind_id.rpartition(".")
+    if not dot:
+        suffix = ""
+    flags = SUFFIX_FLAGS.get(suffix, 0)
+
+    if "%)" in name_lc or "%" in unit_lc or "percent" in unit_lc:
+        flags |= PCT
+    if "growth (annual %)" in name_lc:
+        flags |= GROWTH
+    # share and growth series are never counts, whatever their unit says
+    if suffix not in ("ZS", "ZG") and ("number" in unit_lc or unit_lc.strip() == ""):
+        flags |= COUNT
+    if ".PP" in ind_id or "ppp" in name_lc:
+        flags |= PPP
+    if "constant" in name_lc:
+        flags |= CONSTANT
+    if "current us$" in name_lc or "current" in unit_lc:
+        flags |= CURRENT_USD
+    if ".PC" in ind_id or "per capita" in name_lc:
+        flags |= PER_CAPITA
+    if "rate" in name_lc:
+        flags |= RATE
+    if ".FE." in ind_id:
+        flags |= SEX_FE
+    if ".MA." in ind_id:
+        flags |= SEX_MA
+    # sex-disaggregated series carry the code mid-id; an id merely ending in .FE/.MA is not excluded for "total"
+    if ".FE." in ind_id or ".MA." in ind_id:
+        flags |= SEX_SPLIT
+    for code, bit in AGE_CODE_FLAGS:
+        if code in ind_id:
+            flags |= bit
+    if "consumer prices (annual %)" in name_lc or ind_id == "FP.CPI.TOTL.ZG":
+        flags |= CPI_HEADLINE
+    if ind_id.startswith("NY.GDP.MKTP"):
+        flags |= GDP_MKTP
+    if ind_id.startswith("SP.POP"):
+        flags |= POP_SERIES
+    if ind_id == "SP.POP.TOTL":
+        flags |= POP_TOTAL
+    return flags
+
+
+def popcount(flags):
+    """Number of set bits in each element of a uint32 flag array."""
+    return np.unpackbits(flags.view(np.uint8).reshape(-1, 4), axis=1).sum(axis=1)
+
+
+def score_kernel(flags, semantic, unit_mask, sex_required, sex_forbidden, age_required, prior_rules):
+    """Score candidates from their flags and semantic scores, using integer masks only."""
+    # unit qualifier matching: one point per requested qualifier the indicator has
+    unit_match = popcount(flags & np.uint32(unit_mask))
+
+    # demographics matching
+    demo_match = (
+        (((flags & sex_required) == sex_required) & ((flags & sex_forbidden) == 0)).astype(np.float64) +
+        ((flags & age_required) == age_required)
+    )
+
+    # concept prior: rules are applied last to first so the earliest matching rule wins
+    prior = np.zeros(len(flags))
+    for mask, weight in reversed(prior_rules):
+        prior = np.where((flags & mask) != 0, weight, prior)
+
+    # combined score, summed in a fixed order: a dot product may reorder the reduction
+    # and flip the last bit, which can change which of two tied candidates wins
+    w_sem, w_unit, w_demo, w_prior = SCORE_WEIGHTS
+    return w_sem * semantic + w_unit * unit_match + w_demo * demo_match + w_prior * prior
+
+
+def demographic_masks(sex, age_band):
+    """Return the (required, forbidden) sex/age flag masks for the slots."""
+    required = forbidden = 0
     if sex == "female":
-        return ".FE." in ind_id or ind_id.endswith(".FE.IN") or ind_id.endswith(".FE.ZS") or ind_id.endswith(".FE")
-    if sex == "male":
-        return ".MA." in ind_id or ind_id.endswith(".MA.IN") or ind_id.endswith(".MA.ZS") or ind_id.endswith(".MA")
-    if sex == "total":
-        return not (".FE." in ind_id or ".MA." in ind_id)
-    return True
-
-
-def has_age(ind_id, age_band):
-    if age_band == "none":
-        return True
-
-    age_codes = {"65up": "65UP", "1524": "1524", "0t04": "0T04", "1564": "1564"}
-    code = age_codes.get(age_band)
-    if code:
-        return code in ind_id
-
-    return True
+        required |= SEX_FE
+    elif sex == "male":
+        required |= SEX_MA
+    elif sex == "total":
+        forbidden |= SEX_SPLIT
+    required |= AGE_FLAGS.get(age_band, 0)
+    return required, forbidden
 
 
 def build_query_terms(slots):
-    import re
+    # qualifiers are sorted so the cache key, and the query text, don't depend on set order
+    return _build_query_terms_cached(
+        slots.get("concept") or "",
+        tuple(sorted(set(slots.get("unit_qualifiers") or []))),
+        slots.get("sex"),
+        slots.get("age_band"),
+    )
+
 
+@functools.lru_cache(maxsize=QUERY_TERMS_CACHE_SIZE)
+def _build_query_terms_cached(concept, uq, sex, age_band):
     bits = []
 
-    concept = (slots.get("concept") or "").replace("_", " ").replace("\n", " ").replace("\r", " ")
+    concept = concept.replace("_", " ").replace("\n", " ").replace("\r", " ")
 
-    # Clean concept - remove age/demographic info that's captured separately
-    # Remove patterns like: "female ages 65+", "male ages 15-24", "ages 65 and above"
-    concept = re.sub(r'\b(fe)?male\s+(ages?|age)\s+[\d\-\+\sandabove]+', '', concept, flags=re.IGNORECASE)
-    concept = re.sub(r'\b(fe)?male', '', concept, flags=re.IGNORECASE)
-    concept = re.sub(r'\bages?\s+[\d\-\+\sandabove]+', '', concept, flags=re.IGNORECASE)
-    # Remove age ranges in parentheses: (ages 65+), (age 15-24)
-    concept = re.sub(r'\s*\(ages?\s+[\d\-\+\sandabove]+\)', '', concept, flags=re.IGNORECASE)
-    # Remove gender info in parentheses: (male), (female)
-    concept = re.sub(r'\s*\(.*?(male|female).*?\)', '', concept, flags=re.IGNORECASE)
-    # Collapse multiple spaces
-    concept = re.sub(r'\s+', ' ', concept).strip()
+    # Clean concept - remove age/demographic info that's captured separately.
+    # Every noise pattern contains "male", "age" or "(", so most concepts skip the regex.
+    concept_lc = concept.lower()
+    if "male" in concept_lc or "age" in concept_lc or "(" in concept_lc:
+        concept = RE_CONCEPT_NOISE.sub('', concept)
+        # Collapse multiple spaces
+        concept = RE_WHITESPACE.sub(' ', concept).strip()
+    else:
+        concept = " ".join(concept.split())
 
     if concept and concept != "unknown":
         bits.append(concept)
 
-    uq = set(slots.get("unit_qualifiers") or [])
-
     # Add meaningful qualifiers, skip redundant ones
     for qualifier in uq:
         if qualifier == "percent_share":
@@ -88,11 +209,9 @@ def build_query_terms(slots):
         elif qualifier == "constant_usd":
             bits.append("constant")
 
-    sex = slots.get("sex")
     if sex and sex != "total":
         bits.append(sex)
 
-    age_band = slots.get("age_band")
     if age_band and age_band != "none":
         age_map = {"65up": "65+", "1524": "15-24", "0t04": "0-4", "1564": "15-64"}
         age_str = age_map.get(age_band, age_band)
@@ -105,127 +224,90 @@ def build_query_terms(slots):
 class IndicatorResolver:
     def __init__(self, ind_df):
         self.ind_df = ind_df
-        self.id2row = {row["id"]: row for _, row in ind_df.iterrows()}
 
-    def resolve(self, slots, search_results):
-        # build candidate list
-        candidates = []
-        for ind_id, semantic_score in search_results:
-            row = self.id2row.get(ind_id)
-            if row is None:
-                continue
-
-            candidates.append({
-                'id': row["id"],
-                'name': row["name"],
-                'unit': str(row.get("unit", "")),
-                'topics': str(row.get("topics", "")),
-                'sourceNote': str(row.get("sourceNote", "")),
-                'source': str(row.get("source", "")),
-                'semantic': float(semantic_score)
-            })
+        # column arrays (structure of arrays): scoring only touches the packed flags,
+        # the text columns are read once for the winning candidate
+        self.ids = ind_df["id"].to_numpy(dtype=object)
+        self.names = ind_df["name"].to_numpy(dtype=object)
+        # str() per value (not astype) so a missing unit stays the literal "nan" as before
+        self.units = np.array([str(u) for u in ind_df.get("unit", [""] * len(ind_df))], dtype=object)
 
-        # apply hard constraints
-        filtered = self._apply_constraints(candidates, slots)
-
-        if not filtered:
-            query = build_query_terms(slots)
-            raise ValueError(f"No suitable indicator after constraints for query='{query}'")
-
-        # score and rank
-        scored = self._score_candidates(filtered, slots)
+        self.id2idx = {ind_id: i for i, ind_id in enumerate(self.ids)}
+        self.flags = np.fromiter(
+            (compute_flags(ind_id, name.lower(), u.lower()) for ind_id, name, u in zip(self.ids, self.names, self.units)),
+            dtype=np.uint32, count=len(self.ids)
+        )
 
-        # return best match
-        best = scored[0]
-        second_score = scored[1]["score"] if len(scored) > 1 else 0.0
-        confidence_margin = max(0.0, best["score"] - second_score)
-
-        query = build_query_terms(slots)
-        notes = f"query='{query}', semantic={best['semantic']:.3f}"
-
-        return best["id"], best["name"], best["unit"], confidence_margin, notes
+    def resolve(self, slots, search_results):
+        # translate search results into catalog positions and semantic scores
+        pairs = [(self.id2idx[ind_id], score) for ind_id, score in search_results if ind_id in self.id2idx]
+        idx = np.fromiter((i for i, _ in pairs), dtype=np.int64, count=len(pairs))
+        semantic = np.fromiter((score for _, score in pairs), dtype=np.float64, count=len(pairs))
 
-    def _apply_constraints(self, candidates, slots):
-        uq = set(slots.get("unit_qualifiers") or [])
+        # slot fields shared by the constraint and scoring passes
+        uq = frozenset(slots.get("unit_qualifiers") or ())
         sex = slots.get("sex", "total")
         age = slots.get("age_band", "none")
+        concept_lc = (slots.get("concept") or "").lower()
 
-        filtered = []
-        for cand in candidates:
-            if "ppp" in uq and not is_ppp(cand["id"], cand["name"]):
-                continue
-
-            if "growth_rate" in uq and not is_growth(cand["id"], cand["name"]):
-                continue
-
-            if "percent_share" in uq:
-                if not is_percent(cand["id"], cand["name"], cand["unit"]):
-                    if "rate" not in cand["name"].lower():
-                        continue
-
-            if not has_sex(cand["id"], sex):
-                continue
+        # apply hard constraints
+        keep = self._apply_constraints(idx, uq, sex, age)
+        idx, semantic = idx[keep], semantic[keep]
 
-            if not has_age(cand["id"], age):
-                continue
+        if not len(idx):
+            query = build_query_terms(slots)
+            raise ValueError(f"No suitable indicator after constraints for query='{query}'")
 
-            filtered.append(cand)
+        # score; only the top two matter, so select them in O(n) instead of sorting
+        scores = self._score_candidates(idx, semantic, uq, sex, age, concept_lc)
 
-        return filtered
+        # return best match; argmax takes the first of tied scores, i.e. the earlier search result
+        best = int(np.argmax(scores))
+        second_score = np.partition(scores, -2)[-2] if len(scores) > 1 else 0.0
+        confidence_margin = max(0.0, float(scores[best] - second_score))
 
-    def _score_candidates(self, candidates, slots):
-        uq = set(slots.get("unit_qualifiers") or [])
-        sex = slots.get("sex", "total")
-        age = slots.get("age_band", "none")
-        concept = slots.get("concept", "").lower()
-
-        for cand in candidates:
-            # unit qualifier matching
-            unit_match = 0.0
-            if "ppp" in uq and is_ppp(cand["id"], cand["name"]):
-                unit_match += 1.0
-            if "growth_rate" in uq and is_growth(cand["id"], cand["name"]):
-                unit_match += 1.0
-            if "percent_share" in uq and is_percent(cand["id"], cand["name"], cand["unit"]):
-                unit_match += 1.0
-            if "count_number" in uq and is_count(cand["id"], cand["unit"]):
-                unit_match += 1.0
-            if "constant_usd" in uq and is_constant(cand["id"], cand["name"]):
-                unit_match += 1.0
-            if "current_usd" in uq and is_current_usd(cand["id"], cand["name"], cand["unit"]):
-                unit_match += 1.0
-            if "per_capita" in uq and (".PC" in cand["id"] or "per capita" in cand["name"].lower()):
-                unit_match += 1.0
-
-            # demographics matching
-            demo_match = 0.0
-            if has_sex(cand["id"], sex):
-                demo_match += 1.0
-            if has_age(cand["id"], age):
-                demo_match += 1.0
-
-            # concept-specific boosts
-            prior = 0.0
-            if concept in ("inflation", "inflation_cpi"):
-                if "consumer prices (annual %)" in cand["name"].lower() or cand["id"] == "FP.CPI.TOTL.ZG":
-                    prior += 1.0
-            if concept == "gdp":
-                if cand["id"].startswith("NY.GDP.MKTP"):
-                    prior += 1.0
-            if concept == "population":
-                if cand["id"] == "SP.POP.TOTL" and sex == "total":
-                    prior += 2.0
-                elif cand["id"].startswith("SP.POP"):
-                    prior += 0.8
-
-            # combined score
-            cand["score"] = (
-                0.45 * cand["semantic"] +
-                0.25 * unit_match +
-                0.15 * demo_match +
-                0.10 * prior +
-                0.05 * 0.0
-            )
-
-        candidates.sort(key=lambda x: x["score"], reverse=True)
-        return candidates
+        i = idx[best]
+        query = build_query_terms(slots)
+        notes = f"query='{query}', semantic={semantic[best]:.3f}"
+
+        return self.ids[i], self.names[i], self.units[i], confidence_margin, notes
+
+    def _apply_constraints(self, idx, uq, sex, age):
+        required, forbidden = demographic_masks(sex, age)
+        if "ppp" in uq:
+            required |= PPP
+        if "growth_rate" in uq:
+            required |= GROWTH
+
+        flags = self.flags[idx]
+        keep = ((flags & required) == required) & ((flags & forbidden) == 0)
+
+        # percent share also accepts indicators that are named as a rate
+        if "percent_share" in uq:
+            keep &= (flags & (PCT | RATE)) != 0
+
+        return keep
+
+    def _score_candidates(self, idx, semantic, uq, sex, age, concept_lc):
+        # translate the slots into integer masks; the kernel itself sees no strings
+        unit_mask = 0
+        for qualifier in uq:
+            unit_mask |= UNIT_QUALIFIER_FLAGS.get(qualifier, 0)
+
+        sex_required, sex_forbidden = demographic_masks(sex, "none")
+        age_required = AGE_FLAGS.get(age, 0)
+
+        # concept-specific boosts as (mask, weight) rules, first match wins;
+        # the concept tests are made once, not per candidate
+        prior_rules = []
+        if concept_lc in ("inflation", "inflation_cpi"):
+            prior_rules.append((CPI_HEADLINE, 1.0))
+        if concept_lc == "gdp":
+            prior_rules.append((GDP_MKTP, 1.0))
+        if concept_lc == "population":
+            if sex == "total":
+                prior_rules.append((POP_TOTAL, 2.0))
+            prior_rules.append((POP_SERIES, 0.8))
+
+        return score_kernel(self.flags[idx], semantic, unit_mask,
+                            sex_required, sex_forbidden, age_required, prior_rules)